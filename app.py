@@ -4,6 +4,7 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
+from engine_profiles import EngineProfile
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -24,18 +25,24 @@ database_url = os.environ.get("DATABASE_URL", "sqlite:///nutrition.db")
 if database_url.startswith("postgres://"):
     database_url = database_url.replace("postgres://", "postgresql://", 1)
 app.config["SQLALCHEMY_DATABASE_URI"] = database_url
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
+engine_profile = EngineProfile.for_url(database_url)
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_profile.engine_options
 
 # Initialize the app with the extension
 db.init_app(app)
 
 with app.app_context():
+    # Apply connect-time settings before the first connection is opened
+    engine_profile.install(db.engine)
+    logging.getLogger(__name__).info(engine_profile.describe())
+    
     # Import models to ensure tables are created
     import models
     db.create_all()
     
     # Import and register routes
     import routes
+    
+    # Opt-in request profiling (no hooks are registered unless configured)
+    from request_profiler import init_profiling
+    init_profiling(app, db)
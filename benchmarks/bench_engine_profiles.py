@@ -0,0 +1,136 @@
+"""Compare database engine profiles under concurrent read/write load.
+
+Runs reader threads (ingredient lookups by name) alongside writer threads
+(small upload-style transactions) against each profile and reports
+throughput and read latency percentiles.
+
+    python benchmarks/bench_engine_profiles.py --seconds 10 --readers 8 --writers 2
+    python benchmarks/bench_engine_profiles.py --postgres-url postgresql://user:pw@localhost/bench
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Float, select
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from engine_profiles import EngineProfile  # noqa: E402
+
+metadata = MetaData()
+ingredients = Table(
+    'bench_ingredients', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String(200), nullable=False, index=True),
+    Column('calories', Float, default=0.0),
+    Column('protein', Float, default=0.0),
+)
+
+
+def run_profile(label, url, profile, seconds, readers, writers, seed_rows):
+    engine = create_engine(url, **profile.engine_options)
+    profile.install(engine)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(ingredients.insert(), [
+            {'name': f'Ingredient {i}', 'calories': i % 500, 'protein': i % 40}
+            for i in range(seed_rows)
+        ])
+
+    stop = threading.Event()
+    latencies = []
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def reader():
+        rng = random.Random()
+        local = []
+        while not stop.is_set():
+            name = f'Ingredient {rng.randrange(seed_rows)}'
+            started = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(select(ingredients).where(ingredients.c.name == name)).all()
+                local.append(time.perf_counter() - started)
+            except Exception:
+                with lock:
+                    counts['errors'] += 1
+        with lock:
+            latencies.extend(local)
+            counts['reads'] += len(local)
+
+    def writer():
+        rng = random.Random()
+        done = 0
+        while not stop.is_set():
+            try:
+                with engine.begin() as conn:
+                    for _ in range(20):
+                        conn.execute(ingredients.update()
+                                     .where(ingredients.c.id == rng.randrange(1, seed_rows + 1))
+                                     .values(calories=rng.random() * 500))
+                done += 1
+            except Exception:
+                with lock:
+                    counts['errors'] += 1
+        with lock:
+            counts['writes'] += done
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    metadata.drop_all(engine)
+    engine.dispose()
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    print(f"{label:<22} reads/s={counts['reads'] / seconds:>9.0f}  "
+          f"write txns/s={counts['writes'] / seconds:>7.0f}  "
+          f"p50={pct(0.50):6.2f}ms  p95={pct(0.95):6.2f}ms  p99={pct(0.99):6.2f}ms  "
+          f"errors={counts['errors']}")
+    print(f"{'':<22} {profile.describe()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--postgres-url', help='also benchmark a PostgreSQL database')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rollback = EngineProfile.for_url('sqlite://', {
+            'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL',
+            'SQLITE_MMAP_SIZE': '0', 'SQLITE_CACHE_SIZE': '-2000'})
+        run_profile('sqlite rollback', f"sqlite:///{os.path.join(tmp, 'rollback.db')}",
+                    rollback, args.seconds, args.readers, args.writers, args.rows)
+
+        wal = EngineProfile.for_url('sqlite://', {})
+        run_profile('sqlite wal', f"sqlite:///{os.path.join(tmp, 'wal.db')}",
+                    wal, args.seconds, args.readers, args.writers, args.rows)
+
+    if args.postgres_url:
+        legacy = EngineProfile('default', {})
+        run_profile('postgres legacy', args.postgres_url, legacy,
+                    args.seconds, args.readers, args.writers, args.rows)
+        tuned = EngineProfile.for_url(args.postgres_url)
+        run_profile('postgres profile', args.postgres_url, tuned,
+                    args.seconds, args.readers, args.writers, args.rows)
+
+
+if __name__ == '__main__':
+    main()
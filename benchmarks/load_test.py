@@ -0,0 +1,289 @@
+"""Drive the app under gunicorn with a realistic traffic mix.
+
+Starts gunicorn locally (or targets --url), then runs concurrent clients that
+send a weighted mix of requests:
+
+- /search-ingredients with Zipf-distributed queries (a few popular terms,
+  a long tail of rare ones)
+- /calculate-nutrition with random recipe payloads
+- occasional /save-meal and /upload-data calls
+
+and reports throughput plus p50/p95/p99 latency per route.
+
+/save-meal and /upload-data redirect on both success and failure, so their
+outcome is read from the flash message category in the session cookie.
+
+With --url the mix is read-only unless --allow-writes is given, because the
+write routes create real meals and "Load Test Item" ingredients.
+
+    python benchmarks/load_test.py --workers 2 --concurrency 16 --seconds 30
+    python benchmarks/load_test.py --workers 4 --database-url postgresql://user:pw@localhost/load
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --concurrency 8
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import base64
+import zlib
+import argparse
+import tempfile
+import threading
+import subprocess
+from collections import defaultdict
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = 'search=70,calculate=25,save=3,upload=2'
+
+WRITE_ROUTES = ('save', 'upload')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(workers: int, port: int, database_url: str) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    # Create tables and sample data once so workers do not race to do it
+    subprocess.run([sys.executable, '-c', 'import app'], cwd=ROOT, env=env, check=True)
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}',
+         '--workers', str(workers), '--log-level', 'warning', 'main:app'],
+        cwd=ROOT, env=env
+    )
+
+
+def wait_until_ready(base_url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f'{base_url}/search-ingredients', timeout=2).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f'Server at {base_url} did not become ready')
+
+
+def flashed_categories(response):
+    """Flash categories set by a redirecting route, read from the session cookie.
+
+    Flask's session cookie is signed, not encrypted: a base64 JSON payload,
+    zlib-compressed when prefixed with '.'. Flashes are stored as tagged
+    tuples {" t": [category, message]}.
+    """
+    cookie = response.cookies.get('session')
+    if not cookie:
+        return []
+    compressed = cookie.startswith('.')
+    payload = cookie.lstrip('.').split('.')[0]
+    try:
+        data = base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4))
+        if compressed:
+            data = zlib.decompress(data)
+        flashes = json.loads(data).get('_flashes', [])
+    except (ValueError, zlib.error):
+        return []
+    return [flash[' t'][0] for flash in flashes if isinstance(flash, dict) and ' t' in flash]
+
+
+def write_succeeded(session, response) -> bool:
+    """A write route succeeded if it redirected with a non-error flash"""
+    categories = flashed_categories(response)
+    # Drop the cookie so unread flashes do not pile up across requests
+    session.cookies.clear()
+    return response.status_code < 400 and bool(categories) and 'error' not in categories
+
+
+def zipf_weights(n: int, exponent: float):
+    return [1.0 / (rank ** exponent) for rank in range(1, n + 1)]
+
+
+def parse_mix(spec: str):
+    mix = {}
+    for part in spec.split(','):
+        name, weight = part.split('=')
+        mix[name.strip()] = float(weight)
+    unknown = set(mix) - {'search', 'calculate', 'save', 'upload'}
+    if unknown:
+        raise ValueError(f'Unknown routes in mix: {", ".join(sorted(unknown))}')
+    return mix
+
+
+class TrafficModel:
+    """Builds request payloads from the catalogue the server actually holds"""
+
+    def __init__(self, base_url: str, zipf_exponent: float, seed: int):
+        self.base_url = base_url
+        self.rng = random.Random(seed)
+
+        meta = requests.get(f'{base_url}/catalogue-bundle', timeout=10).json()
+        bundle = requests.get(f"{base_url}{meta['url']}", timeout=30).json()
+        names = [name.lower() for name in bundle['names']]
+        letters = sorted({c for name in names for c in name if c.isalpha()})
+        self.ids = bundle['ids']
+
+        # Popular queries are full names and short prefixes, the tail is rarer substrings
+        queries = []
+        for name in names:
+            queries.extend([name, name[:3], name[:1]])
+        queries.extend(a + b for a in letters for b in letters)
+        self.rng.shuffle(queries)
+        self.queries = queries
+        self.query_weights = zipf_weights(len(queries), zipf_exponent)
+
+    def search(self, session, rng):
+        query = rng.choices(self.queries, weights=self.query_weights)[0]
+        return session.get(f'{self.base_url}/search-ingredients', params={'q': query}, timeout=30)
+
+    def recipe(self, rng):
+        count = min(len(self.ids), rng.randint(2, 8))
+        return [{'id': ingredient_id, 'quantity': rng.choice([15, 30, 50, 100, 150, 200, 250])}
+                for ingredient_id in rng.sample(self.ids, count)]
+
+    def calculate(self, session, rng):
+        return session.post(f'{self.base_url}/calculate-nutrition',
+                            json={'ingredients': self.recipe(rng)}, timeout=30)
+
+    def save(self, session, rng):
+        return session.post(f'{self.base_url}/save-meal', allow_redirects=False, timeout=30, data={
+            'meal_name': f'Load test meal {rng.randrange(1_000_000)}',
+            'ingredients_data': json.dumps(self.recipe(rng))
+        })
+
+    def upload(self, session, rng):
+        # A supplier-style refresh: mostly repeated rows, a few new or changed ones
+        rows = ['name,category,calories,protein,carbs,fat']
+        for i in range(rng.randint(20, 200)):
+            calories = rng.randint(0, 900) if rng.random() < 0.05 else i * 7 % 900
+            rows.append(f'Load Test Item {i},Load Test,{calories},'
+                        f'{i % 40},{i % 80},{i % 60}')
+        body = '\n'.join(rows).encode('utf-8')
+        files = {'file': (f'load_test_{rng.randrange(1_000_000)}.csv', body, 'text/csv')}
+        return session.post(f'{self.base_url}/upload-data', files=files,
+                            allow_redirects=False, timeout=120)
+
+
+def run_load(model: TrafficModel, mix, concurrency: int, seconds: float, seed: int):
+    routes = list(mix)
+    weights = [mix[r] for r in routes]
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client(index):
+        rng = random.Random(seed + index)
+        session = requests.Session()
+        local = defaultdict(list)
+        local_errors = defaultdict(int)
+        while time.monotonic() < deadline:
+            route = rng.choices(routes, weights=weights)[0]
+            started = time.perf_counter()
+            try:
+                response = getattr(model, route)(session, rng)
+                if route in WRITE_ROUTES:
+                    ok = write_succeeded(session, response)
+                else:
+                    ok = response.status_code < 400
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - started
+            local[route].append(elapsed)
+            if not ok:
+                local_errors[route] += 1
+        with lock:
+            for route, values in local.items():
+                latencies[route].extend(values)
+            for route, count in local_errors.items():
+                errors[route] += count
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def report(latencies, errors, elapsed):
+    print(f"{'route':<12}{'requests':>10}{'errors':>8}{'req/s':>10}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    total = 0
+    for route in sorted(latencies):
+        values = sorted(latencies[route])
+        total += len(values)
+        print(f"{route:<12}{len(values):>10}{errors[route]:>8}{len(values) / elapsed:>10.1f}"
+              f"{percentile(values, 0.50) * 1000:>10.1f}"
+              f"{percentile(values, 0.95) * 1000:>10.1f}"
+              f"{percentile(values, 0.99) * 1000:>10.1f}")
+    print(f"{'total':<12}{total:>10}{sum(errors.values()):>8}{total / elapsed:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='target an already running server instead of starting gunicorn')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--database-url', help='database for the spawned server (default: fresh SQLite file)')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'route weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent for search queries')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--allow-writes', action='store_true',
+                        help='with --url, also send /save-meal and /upload-data (creates real data)')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    if args.url and not args.allow_writes:
+        dropped = [route for route in WRITE_ROUTES if route in mix]
+        for route in dropped:
+            del mix[route]
+        if dropped:
+            print(f"Warning: --url without --allow-writes; skipping write routes: {', '.join(dropped)}")
+        if not mix:
+            parser.error('no read-only routes left in --mix')
+    server = None
+    tmp = None
+    base_url = args.url
+    try:
+        if not base_url:
+            database_url = args.database_url
+            if not database_url:
+                tmp = tempfile.TemporaryDirectory()
+                database_url = f"sqlite:///{os.path.join(tmp.name, 'load_test.db')}"
+            port = free_port()
+            base_url = f'http://127.0.0.1:{port}'
+            server = start_gunicorn(args.workers, port, database_url)
+        wait_until_ready(base_url)
+
+        model = TrafficModel(base_url, args.zipf, args.seed)
+        print(f"Target {base_url}  workers={args.workers if server else 'n/a'}  "
+              f"concurrency={args.concurrency}  seconds={args.seconds}  "
+              f"mix={','.join(f'{k}={v:g}' for k, v in mix.items())}")
+        latencies, errors, elapsed = run_load(model, mix, args.concurrency, args.seconds, args.seed)
+        report(latencies, errors, elapsed)
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+        if tmp:
+            tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
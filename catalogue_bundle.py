@@ -0,0 +1,89 @@
+import gzip
+import json
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from app import db
+from models import Ingredient
+from nutrients import NUTRIENT_FIELDS
+from catalogue_cache import CatalogueCache
+
+logger = logging.getLogger(__name__)
+
+# Number of previous bundle versions kept in memory to serve deltas from
+BUNDLE_HISTORY_SIZE = 8
+
+
+class CatalogueBundle:
+    """An immutable, content-hashed snapshot of the ingredient catalogue.
+
+    Rows are stored column by column (ids, names, categories, then one list
+    per nutrient) so the client can scan a single array when searching and
+    the gzip stream compresses repeated categories and zeros well.
+    """
+
+    def __init__(self, rows: Dict[int, Tuple]):
+        self.rows = rows
+        payload = self._columnar(sorted(rows))
+        canonical = json.dumps(payload, separators=(',', ':'), sort_keys=True)
+        self.version = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+        payload['version'] = self.version
+        self.body = self._compress(payload)
+
+    def _columnar(self, ids: List[int]) -> Dict:
+        rows = [self.rows[i] for i in ids]
+        return {
+            'fields': list(NUTRIENT_FIELDS),
+            'ids': ids,
+            'names': [row[0] for row in rows],
+            'categories': [row[1] for row in rows],
+            'values': [[row[2 + n] for row in rows] for n in range(len(NUTRIENT_FIELDS))]
+        }
+
+    @staticmethod
+    def _compress(payload: Dict) -> bytes:
+        data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return gzip.compress(data, compresslevel=9, mtime=0)
+
+    def delta_from(self, previous: 'CatalogueBundle') -> bytes:
+        """Return the compressed changes needed to turn ``previous`` into this bundle"""
+        changed = [i for i, row in self.rows.items() if previous.rows.get(i) != row]
+        removed = [i for i in previous.rows if i not in self.rows]
+        payload = self._columnar(sorted(changed))
+        payload.update({'from': previous.version, 'version': self.version, 'removed': sorted(removed)})
+        return self._compress(payload)
+
+
+_history: 'OrderedDict[str, CatalogueBundle]' = OrderedDict()
+
+
+def _build_bundle() -> CatalogueBundle:
+    columns = [getattr(Ingredient, col) for col in NUTRIENT_FIELDS]
+    query = db.session.query(Ingredient.id, Ingredient.name, Ingredient.category, *columns)
+    rows = {row[0]: (row[1], row[2]) + tuple(v or 0.0 for v in row[3:])
+            for row in query}
+    bundle = CatalogueBundle(rows)
+    _history[bundle.version] = bundle
+    _history.move_to_end(bundle.version)
+    while len(_history) > BUNDLE_HISTORY_SIZE:
+        _history.popitem(last=False)
+    logger.info(f"Built catalogue bundle {bundle.version} with {len(rows)} "
+                f"ingredients ({len(bundle.body)} bytes compressed)")
+    return bundle
+
+
+_bundle_cache = CatalogueCache(_build_bundle)
+
+
+def get_current_bundle() -> CatalogueBundle:
+    """Return the bundle for the current catalogue, rebuilding it only on change"""
+    return _bundle_cache.get()
+
+
+def get_bundle(version: str) -> Optional[CatalogueBundle]:
+    """Return a recently built bundle by version, if still held in memory"""
+    current = get_current_bundle()
+    if version == current.version:
+        return current
+    return _history.get(version)
@@ -0,0 +1,41 @@
+import threading
+from typing import Callable, Generic, Optional, Tuple, TypeVar
+from sqlalchemy import func
+from app import app, db
+from models import Ingredient, IngredientRowHash
+
+T = TypeVar('T')
+
+
+def catalogue_signature() -> Tuple:
+    """Cheap fingerprint that changes whenever an ingredient is added or re-imported"""
+    counts = db.session.query(func.count(Ingredient.id), func.max(Ingredient.id)).one()
+    last_update = db.session.query(func.max(IngredientRowHash.updated_at)).scalar()
+    return tuple(counts) + (last_update,)
+
+
+class CatalogueCache(Generic[T]):
+    """A value derived from the ingredient catalogue, shared across requests.
+
+    ``build`` runs inside an app context and is called again only when
+    ``catalogue_signature()`` changes, so every cache agrees on when the
+    catalogue has changed.
+    """
+
+    def __init__(self, build: Callable[[], T]):
+        self._build = build
+        self._value: Optional[T] = None
+        self._signature: Optional[Tuple] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        with app.app_context():
+            signature = catalogue_signature()
+            if self._value is not None and signature == self._signature:
+                return self._value
+
+            with self._lock:
+                if self._value is None or signature != self._signature:
+                    self._value = self._build()
+                    self._signature = signature
+                return self._value
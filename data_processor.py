@@ -1,10 +1,13 @@
 import pandas as pd
 import numpy as np
 import os
+import hashlib
+from datetime import datetime
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from app import app, db
-from models import Ingredient
+from models import Ingredient, DatasetImport, IngredientRowHash
+from nutrients import NUTRIENT_FIELDS, NutrientVector
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +17,35 @@ class NutritionDataProcessor:
     def __init__(self):
         self.supported_formats = ['.xlsx', '.csv', '.json']
     
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """Return the sha256 hex digest of a file's raw content"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def hash_row(name: str, category, nutrients: NutrientVector) -> str:
+        """Return the sha256 hex digest of a normalized ingredient row"""
+        parts = [str(name), str(category)]
+        parts.extend(repr(value) for value in nutrients.to_array().tolist())
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+    
+    def find_latest_import(self, content_hash: str) -> Optional[DatasetImport]:
+        """Return the most recent import if it was a file with this content hash.
+        
+        Older imports with the same hash do not count: re-uploading an earlier
+        file after a newer one must still roll the data back.
+        """
+        with app.app_context():
+            latest = DatasetImport.query.order_by(DatasetImport.created_at.desc(),
+                                                  DatasetImport.id.desc()).first()
+            if latest and latest.content_hash == content_hash:
+                return latest
+            return None
+    
     def process_excel_file(self, file_path: str) -> pd.DataFrame:
         """Process Excel nutrition data file"""
         try:
@@ -86,11 +118,7 @@ class NutritionDataProcessor:
         df['name'] = df['name'].astype(str).str.strip().str.title()
         
         # Convert nutritional values to float, handling NaN
-        numeric_columns = ['calories', 'protein', 'carbs', 'fat', 'fiber', 'sugar', 
-                          'sodium', 'potassium', 'calcium', 'iron', 'vitamin_a', 
-                          'vitamin_c', 'vitamin_d', 'vitamin_e', 'vitamin_k']
-        
-        for col in numeric_columns:
+        for col in NUTRIENT_FIELDS:
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0)
             else:
@@ -105,75 +133,114 @@ class NutritionDataProcessor:
         logger.info(f"Normalized dataset to {len(df)} unique ingredients")
         return df
     
-    def save_to_database(self, df: pd.DataFrame) -> int:
-        """Save processed data to database"""
+    def save_to_database(self, df: pd.DataFrame, content_hash: Optional[str] = None,
+                         filename: Optional[str] = None) -> Tuple[int, bool]:
+        """Save processed data to database, writing only new or changed rows.
+        
+        Each row is hashed after normalization. Rows whose hash matches the one
+        recorded by a previous import are skipped, changed rows update the
+        ingredient in place. Ingredients that were not created by an import
+        (manual entries, scraped data) are never overwritten. When
+        ``content_hash`` is given the import is recorded in the same transaction.
+        
+        Returns the number of rows written and whether the transaction was
+        committed, so an import that changed nothing can be told from a failed one.
+        """
         saved_count = 0
+        committed = False
         
         with app.app_context():
-            for _, row in df.iterrows():
+            # Load existing ingredients and their row hashes in two queries
+            existing_by_name = {ing.name: ing for ing in Ingredient.query.all()}
+            hashes_by_id = {rh.ingredient_id: rh for rh in IngredientRowHash.query.all()}
+            
+            # Convert all nutrient columns at once; each vector is a view of one row
+            vectors = NutrientVector.rows(df[list(NUTRIENT_FIELDS)].to_numpy(dtype=np.float64))
+            has_category = 'category' in df.columns
+            categories = df['category'].tolist() if has_category else ['Unknown'] * len(df)
+            
+            for name, category, nutrients in zip(df['name'].tolist(), categories, vectors):
                 try:
-                    # Check if ingredient already exists
-                    existing = Ingredient.query.filter_by(name=row['name']).first()
+                    existing = existing_by_name.get(name)
+                    if existing is not None and not has_category:
+                        # Without a category column the stored category is kept,
+                        # so hash that rather than the 'Unknown' placeholder
+                        category = existing.category
+                    row_hash = self.hash_row(name, category, nutrients)
                     
-                    if not existing:
-                        ingredient = Ingredient(
-                            name=row['name'],
-                            category=row.get('category', 'Unknown'),
-                            calories=float(row.get('calories', 0)),
-                            protein=float(row.get('protein', 0)),
-                            carbs=float(row.get('carbs', 0)),
-                            fat=float(row.get('fat', 0)),
-                            fiber=float(row.get('fiber', 0)),
-                            sugar=float(row.get('sugar', 0)),
-                            sodium=float(row.get('sodium', 0)),
-                            potassium=float(row.get('potassium', 0)),
-                            calcium=float(row.get('calcium', 0)),
-                            iron=float(row.get('iron', 0)),
-                            vitamin_a=float(row.get('vitamin_a', 0)),
-                            vitamin_c=float(row.get('vitamin_c', 0)),
-                            vitamin_d=float(row.get('vitamin_d', 0)),
-                            vitamin_e=float(row.get('vitamin_e', 0)),
-                            vitamin_k=float(row.get('vitamin_k', 0))
-                        )
-                        
+                    if existing is None:
+                        ingredient = Ingredient(name=name, category=category)
+                        nutrients.apply_to(ingredient)
                         db.session.add(ingredient)
+                        db.session.add(IngredientRowHash(ingredient=ingredient, row_hash=row_hash))
+                        existing_by_name[name] = ingredient
                         saved_count += 1
+                        continue
+                    
+                    recorded = hashes_by_id.get(existing.id)
+                    if recorded is None or recorded.row_hash == row_hash:
+                        continue
+                    
+                    nutrients.apply_to(existing)
+                    if has_category:
+                        existing.category = category
+                    recorded.row_hash = row_hash
+                    saved_count += 1
                     
                 except Exception as e:
-                    logger.error(f"Error saving ingredient {row.get('name', 'Unknown')}: {e}")
+                    logger.error(f"Error saving ingredient {name}: {e}")
                     continue
             
+            if content_hash:
+                # A file seen before becomes the latest import again
+                record = DatasetImport.query.filter_by(content_hash=content_hash).first()
+                if record is None:
+                    record = DatasetImport(content_hash=content_hash)
+                    db.session.add(record)
+                record.filename = filename
+                record.row_count = saved_count
+                record.created_at = datetime.utcnow()
+            
             try:
                 db.session.commit()
+                committed = True
                 logger.info(f"Successfully saved {saved_count} ingredients to database")
             except Exception as e:
                 db.session.rollback()
                 logger.error(f"Error committing to database: {e}")
                 saved_count = 0
         
-        return saved_count
+        return saved_count, committed
     
-    def process_file(self, file_path: str) -> int:
-        """Process any supported file format"""
+    def process_file(self, file_path: str, content_hash: Optional[str] = None) -> Tuple[int, bool]:
+        """Process any supported file format and record it as the latest import.
+        
+        Returns ``(rows written, imported)`` as for ``save_to_database``.
+        ``content_hash`` may be passed in when the caller has already computed
+        it; callers that want to skip a file identical to the latest import
+        check ``find_latest_import`` first.
+        """
         if not os.path.exists(file_path):
             logger.error(f"File not found: {file_path}")
-            return 0
+            return 0, False
         
         file_ext = os.path.splitext(file_path)[1].lower()
         
+        if file_ext not in ('.xlsx', '.csv'):
+            logger.error(f"Unsupported file format: {file_ext}")
+            return 0, False
+        
         if file_ext == '.xlsx':
             df = self.process_excel_file(file_path)
-        elif file_ext == '.csv':
-            df = self.process_csv_file(file_path)
         else:
-            logger.error(f"Unsupported file format: {file_ext}")
-            return 0
+            df = self.process_csv_file(file_path)
         
         if df.empty:
             logger.error("No data processed from file")
-            return 0
+            return 0, False
         
-        return self.save_to_database(df)
+        content_hash = content_hash or self.hash_file(file_path)
+        return self.save_to_database(df, content_hash, os.path.basename(file_path))
 
 def initialize_sample_data():
     """Initialize database with sample nutrition data if empty"""
@@ -183,7 +250,7 @@ def initialize_sample_data():
             sample_file = os.path.join('sample_data', 'nutrition_sample.csv')
             
             if os.path.exists(sample_file):
-                count = processor.process_file(sample_file)
+                count, _ = processor.process_file(sample_file)
                 logger.info(f"Initialized database with {count} sample ingredients")
             else:
                 logger.warning("No sample data file found")
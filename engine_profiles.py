@@ -0,0 +1,147 @@
+import os
+import json
+import logging
+from typing import Dict, Optional
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Setting name -> (environment variable, type, default) for each profile.
+# A JSON file named by DB_CONFIG_FILE may set the same names; environment
+# variables win over the file.
+SQLITE_SETTINGS = {
+    'journal_mode': ('SQLITE_JOURNAL_MODE', str, 'WAL'),
+    'synchronous': ('SQLITE_SYNCHRONOUS', str, 'NORMAL'),
+    'mmap_size': ('SQLITE_MMAP_SIZE', int, 256 * 1024 * 1024),
+    'cache_size': ('SQLITE_CACHE_SIZE', int, -64000),  # negative = KiB
+    'busy_timeout': ('SQLITE_BUSY_TIMEOUT', int, 5000),  # ms
+}
+
+POSTGRES_SETTINGS = {
+    'pool_size': ('DB_POOL_SIZE', int, 5),
+    'max_overflow': ('DB_MAX_OVERFLOW', int, 10),
+    'pool_timeout': ('DB_POOL_TIMEOUT', int, 30),
+    'pool_recycle': ('DB_POOL_RECYCLE', int, 300),
+    'pool_pre_ping': ('DB_POOL_PRE_PING', bool, True),
+    'statement_timeout': ('DB_STATEMENT_TIMEOUT', int, 30000),  # ms, 0 disables
+    'prepare_threshold': ('DB_PREPARE_THRESHOLD', int, None),  # psycopg 3 only
+}
+
+PROFILES = {
+    'sqlite': SQLITE_SETTINGS,
+    'postgres': POSTGRES_SETTINGS,
+}
+
+
+def _convert(value, kind):
+    if value is None or isinstance(value, kind):
+        return value
+    if kind is bool:
+        return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+    return kind(value)
+
+
+def _load_config_file(path: Optional[str]) -> Dict:
+    if not path:
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Error reading database config file {path}: {e}")
+        return {}
+
+
+class EngineProfile:
+    """Engine options and connect-time settings for one database backend"""
+
+    def __init__(self, name: str, settings: Dict, database_url: str = ''):
+        self.name = name
+        self.settings = settings
+        self.database_url = database_url
+
+    @classmethod
+    def for_url(cls, database_url: str, environ=None) -> 'EngineProfile':
+        """Pick and configure the profile for a database URL.
+
+        DB_PROFILE (or "profile" in the config file) overrides the choice made
+        from the URL scheme. Unknown backends get the generic pool settings.
+        """
+        environ = os.environ if environ is None else environ
+        file_settings = _load_config_file(environ.get('DB_CONFIG_FILE'))
+
+        name = environ.get('DB_PROFILE') or file_settings.get('profile')
+        if not name:
+            if database_url.startswith('sqlite'):
+                name = 'sqlite'
+            elif database_url.startswith('postgresql'):
+                name = 'postgres'
+            else:
+                name = 'default'
+
+        settings = {}
+        for key, (env_var, kind, default) in PROFILES.get(name, {}).items():
+            value = environ.get(env_var, file_settings.get(key, default))
+            settings[key] = _convert(value, kind)
+        return cls(name, settings, database_url)
+
+    @property
+    def engine_options(self) -> Dict:
+        """Keyword arguments for SQLALCHEMY_ENGINE_OPTIONS / create_engine"""
+        if self.name == 'sqlite':
+            # Local file: nothing to ping or recycle; busy_timeout is set as a pragma
+            return {}
+        if self.name == 'postgres':
+            s = self.settings
+            connect_args = {}
+            if s['statement_timeout']:
+                connect_args['options'] = f"-c statement_timeout={s['statement_timeout']}"
+            # psycopg2 has no prepared statement setting and rejects the argument
+            if s['prepare_threshold'] is not None and self.database_url.startswith('postgresql+psycopg:'):
+                connect_args['prepare_threshold'] = s['prepare_threshold']
+            options = {
+                'pool_size': s['pool_size'],
+                'max_overflow': s['max_overflow'],
+                'pool_timeout': s['pool_timeout'],
+                'pool_recycle': s['pool_recycle'],
+                'pool_pre_ping': s['pool_pre_ping'],
+            }
+            if connect_args:
+                options['connect_args'] = connect_args
+            return options
+        return {
+            'pool_recycle': 300,
+            'pool_pre_ping': True,
+        }
+
+    def install(self, engine) -> None:
+        """Register connect-time hooks (SQLite pragmas) on an engine"""
+        if self.name != 'sqlite':
+            return
+
+        for key in ('journal_mode', 'synchronous'):
+            if not str(self.settings[key]).isalpha():
+                raise ValueError(f"Invalid SQLite {key}: {self.settings[key]!r}")
+
+        pragmas = [
+            f"PRAGMA journal_mode={self.settings['journal_mode']}",
+            f"PRAGMA synchronous={self.settings['synchronous']}",
+            f"PRAGMA mmap_size={self.settings['mmap_size']}",
+            f"PRAGMA cache_size={self.settings['cache_size']}",
+            f"PRAGMA busy_timeout={self.settings['busy_timeout']}",
+        ]
+
+        @event.listens_for(engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+    def describe(self) -> str:
+        """One-line summary of the effective settings for the startup log"""
+        effective = self.settings or self.engine_options
+        options = ', '.join(f'{k}={v}' for k, v in effective.items())
+        return f"Database engine profile: {self.name} ({options})"
@@ -2,6 +2,7 @@ from app import db
 from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from nutrients import NUTRIENT_FIELDS
 
 class Ingredient(db.Model):
     __tablename__ = 'ingredients'
@@ -37,21 +38,7 @@ class Ingredient(db.Model):
             'id': self.id,
             'name': self.name,
             'category': self.category,
-            'calories': self.calories,
-            'protein': self.protein,
-            'carbs': self.carbs,
-            'fat': self.fat,
-            'fiber': self.fiber,
-            'sugar': self.sugar,
-            'sodium': self.sodium,
-            'potassium': self.potassium,
-            'calcium': self.calcium,
-            'iron': self.iron,
-            'vitamin_a': self.vitamin_a,
-            'vitamin_c': self.vitamin_c,
-            'vitamin_d': self.vitamin_d,
-            'vitamin_e': self.vitamin_e,
-            'vitamin_k': self.vitamin_k
+            **{field: getattr(self, field) for field in NUTRIENT_FIELDS}
         }
 
 class Meal(db.Model):
@@ -82,3 +69,28 @@ class MealIngredient(db.Model):
     
     def __repr__(self):
         return f'<MealIngredient {self.ingredient.name}: {self.quantity}g>'
+
+class DatasetImport(db.Model):
+    __tablename__ = 'dataset_imports'
+    
+    id = Column(Integer, primary_key=True)
+    filename = Column(String(255), nullable=True)
+    content_hash = Column(String(64), nullable=False, unique=True, index=True)  # sha256 of the raw file
+    row_count = Column(Integer, default=0)  # rows inserted or updated by this import
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<DatasetImport {self.filename} {self.content_hash[:12]}>'
+
+class IngredientRowHash(db.Model):
+    __tablename__ = 'ingredient_row_hashes'
+    
+    id = Column(Integer, primary_key=True)
+    ingredient_id = Column(Integer, ForeignKey('ingredients.id'), nullable=False, unique=True)
+    row_hash = Column(String(64), nullable=False)  # sha256 of the normalized dataset row
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    ingredient = relationship("Ingredient")
+    
+    def __repr__(self):
+        return f'<IngredientRowHash {self.ingredient_id} {self.row_hash[:12]}>'
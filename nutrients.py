@@ -0,0 +1,101 @@
+import numpy as np
+from typing import Dict, Iterable, List, Mapping
+
+# Nutrients stored per 100g, in the fixed order used by every NutrientVector
+NUTRIENT_FIELDS = (
+    'calories', 'protein', 'carbs', 'fat', 'fiber', 'sugar',
+    'sodium', 'potassium', 'calcium', 'iron',
+    'vitamin_a', 'vitamin_c', 'vitamin_d', 'vitamin_e', 'vitamin_k',
+)
+
+FIELD_INDEX = {field: i for i, field in enumerate(NUTRIENT_FIELDS)}
+
+
+class NutrientVector:
+    """Fixed-order nutrient values backed by a float64 NumPy array.
+
+    A vector can wrap a row of a larger (n, len(NUTRIENT_FIELDS)) matrix
+    without copying, so many ingredients can be scaled and summed at once
+    with the ``*_many`` helpers and viewed individually afterwards.
+    """
+
+    __slots__ = ('values',)
+
+    def __init__(self, values=None):
+        if values is None:
+            self.values = np.zeros(len(NUTRIENT_FIELDS))
+        else:
+            self.values = np.asarray(values, dtype=np.float64)
+            if self.values.shape != (len(NUTRIENT_FIELDS),):
+                raise ValueError(f"Expected {len(NUTRIENT_FIELDS)} nutrient values, "
+                                 f"got shape {self.values.shape}")
+
+    @classmethod
+    def from_mapping(cls, mapping: Mapping) -> 'NutrientVector':
+        """Build from a dict, form or pandas row; missing fields are 0"""
+        return cls([float(mapping.get(field, 0)) for field in NUTRIENT_FIELDS])
+
+    @classmethod
+    def from_model(cls, model) -> 'NutrientVector':
+        """Build from an object with one attribute per nutrient (e.g. Ingredient)"""
+        return cls([getattr(model, field) or 0.0 for field in NUTRIENT_FIELDS])
+
+    def apply_to(self, model) -> None:
+        """Copy the values onto an object with one attribute per nutrient"""
+        for field, value in zip(NUTRIENT_FIELDS, self.values.tolist()):
+            setattr(model, field, value)
+
+    def to_array(self) -> np.ndarray:
+        """The underlying array (not a copy)"""
+        return self.values
+
+    def to_dict(self) -> Dict[str, float]:
+        return dict(zip(NUTRIENT_FIELDS, self.values.tolist()))
+
+    def scale(self, factor: float) -> 'NutrientVector':
+        return NutrientVector(self.values * factor)
+
+    def __getitem__(self, field: str) -> float:
+        return float(self.values[FIELD_INDEX[field]])
+
+    def __add__(self, other: 'NutrientVector') -> 'NutrientVector':
+        return NutrientVector(self.values + other.values)
+
+    def __mul__(self, factor: float) -> 'NutrientVector':
+        return self.scale(factor)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, NutrientVector) and np.array_equal(self.values, other.values)
+
+    def __repr__(self):
+        return f'<NutrientVector {self.to_dict()}>'
+
+    @staticmethod
+    def stack(vectors: Iterable['NutrientVector']) -> np.ndarray:
+        """Combine vectors into an (n, len(NUTRIENT_FIELDS)) matrix"""
+        rows = [vector.values for vector in vectors]
+        if not rows:
+            return np.zeros((0, len(NUTRIENT_FIELDS)))
+        return np.vstack(rows)
+
+    @staticmethod
+    def rows(matrix: np.ndarray) -> List['NutrientVector']:
+        """View each row of a nutrient matrix as a vector, without copying"""
+        return [NutrientVector(row) for row in matrix]
+
+    @staticmethod
+    def matrix_from_models(models: Iterable) -> np.ndarray:
+        """Nutrient matrix for a sequence of objects such as Ingredient rows"""
+        return NutrientVector.stack(NutrientVector.from_model(model) for model in models)
+
+    @staticmethod
+    def scale_many(matrix: np.ndarray, factors) -> np.ndarray:
+        """Scale row i of a nutrient matrix by factors[i]"""
+        return matrix * np.asarray(factors, dtype=np.float64)[:, np.newaxis]
+
+    @staticmethod
+    def sum(matrix: np.ndarray) -> 'NutrientVector':
+        """Column totals of a nutrient matrix"""
+        return NutrientVector(matrix.sum(axis=0))
@@ -0,0 +1,258 @@
+import re
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from app import db
+from models import Ingredient
+from catalogue_cache import CatalogueCache
+
+logger = logging.getLogger(__name__)
+
+# Grams per unit. Volumes assume the density of water, which is close enough
+# for most recipe ingredients and keeps the parser free of per-food tables.
+UNIT_GRAMS = {
+    'mg': 0.001,
+    'milligram': 0.001,
+    'milligrams': 0.001,
+    'g': 1.0,
+    'gr': 1.0,
+    'gram': 1.0,
+    'grams': 1.0,
+    'kg': 1000.0,
+    'kilogram': 1000.0,
+    'kilograms': 1000.0,
+    'oz': 28.35,
+    'ounce': 28.35,
+    'ounces': 28.35,
+    'lb': 453.6,
+    'lbs': 453.6,
+    'pound': 453.6,
+    'pounds': 453.6,
+    'ml': 1.0,
+    'milliliter': 1.0,
+    'milliliters': 1.0,
+    'l': 1000.0,
+    'liter': 1000.0,
+    'liters': 1000.0,
+    'cup': 240.0,
+    'cups': 240.0,
+    'tbsp': 15.0,
+    'tablespoon': 15.0,
+    'tablespoons': 15.0,
+    'tsp': 5.0,
+    'teaspoon': 5.0,
+    'teaspoons': 5.0,
+}
+
+UNICODE_FRACTIONS = {'½': 0.5, '¼': 0.25, '¾': 0.75, '⅓': 1 / 3, '⅔': 2 / 3}
+
+QUANTITY_PATTERN = re.compile(
+    r'(?P<qty>\d+\s+\d+/\d+|\d+/\d+|\d+(?:[.,]\d+)?\s*[½¼¾⅓⅔]?|[½¼¾⅓⅔])'
+    r'\s*(?:(?P<unit>' + '|'.join(sorted(UNIT_GRAMS, key=len, reverse=True)) + r')\.?\b)?',
+    re.IGNORECASE
+)
+
+
+def parse_quantity(text: str) -> float:
+    """Convert '2', '1.5', '1/2', '1 1/2' or '1½' to a float"""
+    text = text.strip().replace(',', '.')
+    total = 0.0
+    for char, value in UNICODE_FRACTIONS.items():
+        if char in text:
+            total += value
+            text = text.replace(char, '').strip()
+    if not text:
+        return total
+    parts = text.split()
+    for part in parts:
+        if '/' in part:
+            numerator, denominator = part.split('/', 1)
+            total += float(numerator) / float(denominator)
+        else:
+            total += float(part)
+    return total
+
+
+def extract_quantity(line: str) -> Tuple[Optional[float], Optional[str], Optional[float]]:
+    """Return (grams, unit, count) for the quantity in a line.
+
+    The first quantity with a unit wins, so "2 chicken breasts (about 400 g)"
+    is 400 grams. Grams are only known when some quantity has a unit. A bare
+    count such as "2 eggs" is returned as count with grams None, and a line
+    without any quantity ("salt to taste") returns all None, so callers never
+    total a guessed weight.
+    """
+    count = None
+    for match in QUANTITY_PATTERN.finditer(line):
+        try:
+            amount = parse_quantity(match.group('qty'))
+        except (ValueError, ZeroDivisionError):
+            continue
+        unit = match.group('unit')
+        if unit:
+            unit = unit.lower()
+            return amount * UNIT_GRAMS[unit], unit, None
+        if count is None:
+            count = amount
+    return None, None, count
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher over a fixed set of keywords.
+
+    Keywords are compiled once into a trie with failure links, after which
+    every occurrence of every keyword in a text is found in one pass.
+    """
+
+    def __init__(self, keywords: Dict[str, object]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, object]]] = [[]]
+
+        for keyword, payload in keywords.items():
+            self._add(keyword, payload)
+        self._build_failure_links()
+
+    def _add(self, keyword: str, payload: object) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append((len(keyword), payload))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def iter_matches(self, text: str):
+        """Yield (start, end, payload) for every keyword occurrence in text"""
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, payload in output[state]:
+                yield index - length + 1, index + 1, payload
+
+
+class IngredientMatcher:
+    """Find catalogue ingredient mentions in free text"""
+
+    def __init__(self, ingredients: List[Tuple[int, str]]):
+        keywords = {}
+        for ingredient_id, name in ingredients:
+            base = name.lower().strip()
+            if not base:
+                continue
+            # Simple plurals so "2 tomatoes" matches "Tomato"
+            for variant in (base, base + 's', base + 'es'):
+                keywords.setdefault(variant, (ingredient_id, name))
+        self.automaton = AhoCorasick(keywords)
+
+    def find(self, text: str) -> List[Tuple[int, int, int, str]]:
+        """Return non-overlapping whole-word matches, longest first.
+
+        Each match is a (start, end, ingredient_id, name) tuple, ordered by
+        position in the text.
+        """
+        lowered = text.lower()
+        candidates = []
+        for start, end, (ingredient_id, name) in self.automaton.iter_matches(lowered):
+            if start > 0 and lowered[start - 1].isalnum():
+                continue
+            if end < len(lowered) and lowered[end].isalnum():
+                continue
+            candidates.append((start, end, ingredient_id, name))
+
+        # Prefer "Chicken Breast" over "Chicken" when both match
+        candidates.sort(key=lambda m: (m[0] - m[1], m[0]))
+        taken = []
+        for candidate in candidates:
+            if all(candidate[1] <= other[0] or candidate[0] >= other[1] for other in taken):
+                taken.append(candidate)
+        taken.sort()
+        return taken
+
+
+def _build_matcher() -> IngredientMatcher:
+    rows = db.session.query(Ingredient.id, Ingredient.name).all()
+    matcher = IngredientMatcher(rows)
+    logger.info(f"Built ingredient matcher for {len(rows)} ingredients")
+    return matcher
+
+
+_matcher_cache = CatalogueCache(_build_matcher)
+
+
+def get_ingredient_matcher() -> IngredientMatcher:
+    """Return the shared matcher, rebuilding it only when the catalogue changed"""
+    return _matcher_cache.get()
+
+
+class RecipeParser:
+    """Turn pasted recipe text into ingredient ids and gram quantities"""
+
+    def __init__(self, matcher: Optional[IngredientMatcher] = None):
+        self.matcher = matcher or get_ingredient_matcher()
+
+    def parse(self, text: str) -> Dict:
+        """Parse a recipe, one ingredient per line.
+
+        Returns a dict with ``ingredients`` (id, name, quantity in grams, unit,
+        count and source line) and ``unmatched`` lines that named no known
+        ingredient. ``quantity`` is None when the line gives no weight or
+        volume; such ingredients need a quantity from the user.
+        """
+        lines = text.splitlines()
+        line_starts = []
+        offset = 0
+        for line in lines:
+            line_starts.append(offset)
+            offset += len(line) + 1
+
+        # Match the whole text in a single pass, then assign matches to lines
+        matches_by_line: Dict[int, List[Tuple[int, int, int, str]]] = {}
+        line_index = 0
+        for match in self.matcher.find('\n'.join(lines)):
+            while line_index + 1 < len(line_starts) and match[0] >= line_starts[line_index + 1]:
+                line_index += 1
+            matches_by_line.setdefault(line_index, []).append(match)
+
+        ingredients = []
+        unmatched = []
+        for index, line in enumerate(lines):
+            if not line.strip():
+                continue
+            matches = matches_by_line.get(index)
+            if not matches:
+                unmatched.append(line.strip())
+                continue
+
+            # Longest mention wins when a line names several ingredients
+            _, _, ingredient_id, name = max(matches, key=lambda m: m[1] - m[0])
+            grams, unit, count = extract_quantity(line)
+            ingredients.append({
+                'id': ingredient_id,
+                'name': name,
+                'quantity': round(grams, 2) if grams is not None else None,
+                'unit': unit,
+                'count': count,
+                'line': line.strip()
+            })
+
+        return {'ingredients': ingredients, 'unmatched': unmatched}
@@ -0,0 +1,218 @@
+import os
+import sys
+import time
+import hmac
+import uuid
+import random
+import pstats
+import cProfile
+import logging
+import threading
+from io import StringIO
+from collections import Counter
+from typing import Dict, List, Optional
+from flask import request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# The profile of the request running on this thread. A thread-local rather
+# than flask.g because helpers such as NutritionDataProcessor push their own
+# app context, which would hide g from the SQL event hooks.
+_active = threading.local()
+
+
+class ProfilerConfig:
+    """Request profiling settings, read from the environment.
+
+    PROFILE_TOKEN      enables profiling of requests sent with a matching
+                       ``X-Profile`` header
+    PROFILE_SAMPLE_RATE  fraction of all requests to profile (0 disables)
+    PROFILE_MODE       ``sample`` (stack sampling, collapsed stacks) or
+                       ``deterministic`` (cProfile, .pstats)
+    PROFILE_INTERVAL   sampling interval in seconds
+    PROFILE_DIR        where profiles are written
+    PROFILE_TOP_N      number of entries in the text summary
+    """
+
+    HEADER = 'X-Profile'
+
+    def __init__(self, environ=None):
+        environ = os.environ if environ is None else environ
+        self.token = environ.get('PROFILE_TOKEN', '')
+        self.sample_rate = float(environ.get('PROFILE_SAMPLE_RATE', 0))
+        self.mode = environ.get('PROFILE_MODE', 'sample')
+        self.interval = float(environ.get('PROFILE_INTERVAL', 0.005))
+        self.directory = environ.get('PROFILE_DIR', '/tmp/nutrition-profiles')
+        self.top_n = int(environ.get('PROFILE_TOP_N', 25))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token) or self.sample_rate > 0
+
+    def wants_profile(self) -> bool:
+        header = request.headers.get(self.HEADER)
+        # Compare bytes: compare_digest rejects non-ASCII str arguments
+        if header and self.token and hmac.compare_digest(header.encode('utf-8'),
+                                                         self.token.encode('utf-8')):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+
+class StackSampler:
+    """Periodically sample one thread's Python stack from a helper thread"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format read by flamegraph.pl and speedscope"""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def summary(self, top_n: int) -> List[str]:
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                total_counts[frame] += count
+        total = sum(self.stacks.values()) or 1
+        lines = [f'{"self %":>7} {"total %":>7}  function']
+        for frame, count in self_counts.most_common(top_n):
+            lines.append(f'{100.0 * count / total:>7.1f} {100.0 * total_counts[frame] / total:>7.1f}  {frame}')
+        return lines
+
+
+class RequestProfile:
+    """Profiler and SQL timings for a single request"""
+
+    def __init__(self, config: ProfilerConfig):
+        self.config = config
+        self.id = uuid.uuid4().hex[:12]
+        self.sql_time = 0.0
+        self.sql_count = 0
+        self.slow_statements: Dict[str, float] = {}
+        self.sampler: Optional[StackSampler] = None
+        self.profiler: Optional[cProfile.Profile] = None
+        self.started = time.perf_counter()
+
+    def start(self) -> None:
+        if self.config.mode == 'deterministic':
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.sampler = StackSampler(threading.get_ident(), self.config.interval)
+            self.sampler.start()
+
+    def record_sql(self, statement: str, elapsed: float) -> None:
+        self.sql_time += elapsed
+        self.sql_count += 1
+        key = ' '.join(statement.split())[:200]
+        self.slow_statements[key] = self.slow_statements.get(key, 0.0) + elapsed
+
+    def finish(self, endpoint: str) -> None:
+        elapsed = time.perf_counter() - self.started
+        if self.profiler:
+            self.profiler.disable()
+        if self.sampler:
+            self.sampler.stop()
+
+        os.makedirs(self.config.directory, exist_ok=True)
+        base = os.path.join(self.config.directory,
+                            f'{time.strftime("%Y%m%d-%H%M%S")}-{endpoint}-{self.id}')
+
+        lines = [
+            f'{request.method} {request.path} ({endpoint})',
+            f'wall time: {elapsed * 1000:.1f} ms',
+            f'sql time:  {self.sql_time * 1000:.1f} ms in {self.sql_count} statements '
+            f'({100.0 * self.sql_time / elapsed if elapsed else 0:.1f}%)',
+            '',
+            'slowest SQL (total ms):',
+        ]
+        for statement, total in sorted(self.slow_statements.items(), key=lambda s: -s[1])[:self.config.top_n]:
+            lines.append(f'{total * 1000:>9.1f}  {statement}')
+        lines.append('')
+
+        if self.profiler:
+            self.profiler.dump_stats(base + '.pstats')
+            stream = StringIO()
+            pstats.Stats(self.profiler, stream=stream).sort_stats('cumulative').print_stats(self.config.top_n)
+            lines.append(stream.getvalue())
+        else:
+            with open(base + '.collapsed', 'w') as f:
+                f.write(self.sampler.collapsed())
+            lines.append(f'{sum(self.sampler.stacks.values())} samples every {self.config.interval * 1000:g} ms:')
+            lines.extend(self.sampler.summary(self.config.top_n))
+
+        with open(base + '.txt', 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        logger.info(f"Profiled {request.path} in {elapsed * 1000:.1f} ms -> {base}.*")
+
+
+def init_profiling(app, db, config: Optional[ProfilerConfig] = None) -> None:
+    """Register profiling hooks; does nothing at all unless profiling is configured"""
+    config = config or ProfilerConfig()
+    if not config.enabled:
+        return
+
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if getattr(_active, 'profile', None):
+            conn.info.setdefault('profile_query_start', []).append(time.perf_counter())
+
+    @event.listens_for(db.engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = getattr(_active, 'profile', None)
+        starts = conn.info.get('profile_query_start')
+        if profile and starts:
+            profile.record_sql(statement, time.perf_counter() - starts.pop())
+
+    @app.before_request
+    def start_request_profile():
+        if config.wants_profile():
+            _active.profile = RequestProfile(config)
+            _active.profile.start()
+
+    @app.after_request
+    def add_profile_header(response):
+        profile = getattr(_active, 'profile', None)
+        if profile:
+            response.headers['X-Profile-Id'] = profile.id
+        return response
+
+    @app.teardown_request
+    def finish_request_profile(exc):
+        profile = getattr(_active, 'profile', None)
+        _active.profile = None
+        if profile:
+            try:
+                profile.finish(request.endpoint or 'unknown')
+            except Exception as e:
+                logger.error(f"Error writing request profile: {e}")
+
+    logger.info(f"Request profiling enabled (mode={config.mode}, sample_rate={config.sample_rate}, "
+                f"header={'on' if config.token else 'off'}, dir={config.directory})")
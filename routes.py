@@ -3,8 +3,12 @@ from app import app, db
 from models import Ingredient, Meal, MealIngredient
 from data_processor import NutritionDataProcessor, initialize_sample_data
 from web_scraper import NutritionScraper
+from recipe_parser import RecipeParser
+from catalogue_bundle import get_current_bundle, get_bundle
+from nutrients import NutrientVector
 import logging
 import json
+import gzip
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +54,90 @@ def search_ingredients():
     
     return jsonify([ingredient.to_dict() for ingredient in ingredients])
 
+def _bundle_response(body, version):
+    """Serve a pre-compressed, immutable catalogue blob"""
+    # Blobs are stored gzip'd; decompress for clients that did not ask for gzip
+    if request.accept_encodings['gzip']:
+        response = app.response_class(body, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(f'{version}-gzip')
+    else:
+        response = app.response_class(gzip.decompress(body), mimetype='application/json')
+        response.set_etag(version)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response.make_conditional(request)
+
+@app.route('/catalogue-bundle')
+def catalogue_bundle():
+    """Current catalogue version and where to fetch it"""
+    bundle = get_current_bundle()
+    response = jsonify({
+        'version': bundle.version,
+        'url': url_for('catalogue_bundle_version', version=bundle.version),
+        'size': len(bundle.body)
+    })
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/catalogue-bundle/<version>')
+def catalogue_bundle_version(version):
+    """Full columnar catalogue for one version"""
+    bundle = get_bundle(version)
+    if bundle is None:
+        return jsonify({'error': 'Unknown catalogue version'}), 404
+    return _bundle_response(bundle.body, bundle.version)
+
+@app.route('/catalogue-bundle/<version>/delta/<from_version>')
+def catalogue_bundle_delta(version, from_version):
+    """Rows added, changed or removed between two catalogue versions"""
+    bundle = get_bundle(version)
+    previous = get_bundle(from_version)
+    if bundle is None or previous is None:
+        return jsonify({'error': 'Unknown catalogue version'}), 404
+    return _bundle_response(bundle.delta_from(previous), f'{from_version}-{version}')
+
+def _parse_ingredient_id(value):
+    """Accept 3, 3.0 or "3" as an ingredient id; raise ValueError otherwise"""
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f"Invalid ingredient id: {value!r}")
+    try:
+        return int(value)
+    except TypeError:
+        raise ValueError(f"Invalid ingredient id: {value!r}")
+
+def build_nutrition_summary(selected_ingredients):
+    """Total the nutrition of (id, quantity in grams) selections.
+    
+    Raises ValueError for ids or quantities that are not numbers.
+    """
+    item_ids = [_parse_ingredient_id(item.get('id')) for item in selected_ingredients]
+    ingredients_by_id = {ingredient.id: ingredient for ingredient
+                         in Ingredient.query.filter(Ingredient.id.in_(set(item_ids)))}
+    
+    chosen = []
+    quantities = []
+    for item, item_id in zip(selected_ingredients, item_ids):
+        ingredient = ingredients_by_id.get(item_id)
+        quantity = float(item.get('quantity', 0))
+        if ingredient and quantity > 0:
+            chosen.append(ingredient)
+            quantities.append(quantity)
+    
+    # Scale every ingredient at once (values are per 100g), then total
+    matrix = NutrientVector.scale_many(NutrientVector.matrix_from_models(chosen),
+                                       [q / 100.0 for q in quantities])
+    
+    ingredient_details = [
+        {'name': ingredient.name, 'quantity': quantity, **vector.to_dict()}
+        for ingredient, quantity, vector in zip(chosen, quantities, NutrientVector.rows(matrix))
+    ]
+    
+    return {
+        'total': NutrientVector.sum(matrix).to_dict(),
+        'ingredients': ingredient_details
+    }
+
 @app.route('/calculate-nutrition', methods=['POST'])
 def calculate_nutrition():
     """Calculate nutrition for selected ingredients"""
@@ -60,70 +148,40 @@ def calculate_nutrition():
         if not selected_ingredients:
             return jsonify({'error': 'No ingredients selected'}), 400
         
-        total_nutrition = {
-            'calories': 0,
-            'protein': 0,
-            'carbs': 0,
-            'fat': 0,
-            'fiber': 0,
-            'sugar': 0,
-            'sodium': 0,
-            'potassium': 0,
-            'calcium': 0,
-            'iron': 0,
-            'vitamin_a': 0,
-            'vitamin_c': 0,
-            'vitamin_d': 0,
-            'vitamin_e': 0,
-            'vitamin_k': 0
-        }
+        return jsonify(build_nutrition_summary(selected_ingredients))
         
-        ingredient_details = []
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': f'Invalid ingredient data: {e}'}), 400
+    except Exception as e:
+        logger.error(f"Error calculating nutrition: {e}")
+        return jsonify({'error': 'Error calculating nutrition'}), 500
+
+@app.route('/parse-recipe', methods=['POST'])
+def parse_recipe():
+    """Parse pasted recipe text and calculate its nutrition"""
+    try:
+        data = request.get_json(silent=True)
+        text = data.get('text', '') if isinstance(data, dict) else None
         
-        for item in selected_ingredients:
-            ingredient_id = item.get('id')
-            quantity = float(item.get('quantity', 0))
-            
-            ingredient = Ingredient.query.get(ingredient_id)
-            if ingredient and quantity > 0:
-                # Calculate nutrition for this quantity (per 100g base)
-                multiplier = quantity / 100.0
-                
-                ingredient_nutrition = {
-                    'name': ingredient.name,
-                    'quantity': quantity,
-                    'calories': ingredient.calories * multiplier,
-                    'protein': ingredient.protein * multiplier,
-                    'carbs': ingredient.carbs * multiplier,
-                    'fat': ingredient.fat * multiplier,
-                    'fiber': ingredient.fiber * multiplier,
-                    'sugar': ingredient.sugar * multiplier,
-                    'sodium': ingredient.sodium * multiplier,
-                    'potassium': ingredient.potassium * multiplier,
-                    'calcium': ingredient.calcium * multiplier,
-                    'iron': ingredient.iron * multiplier,
-                    'vitamin_a': ingredient.vitamin_a * multiplier,
-                    'vitamin_c': ingredient.vitamin_c * multiplier,
-                    'vitamin_d': ingredient.vitamin_d * multiplier,
-                    'vitamin_e': ingredient.vitamin_e * multiplier,
-                    'vitamin_k': ingredient.vitamin_k * multiplier
-                }
-                
-                ingredient_details.append(ingredient_nutrition)
-                
-                # Add to totals
-                for key in total_nutrition:
-                    if key in ingredient_nutrition:
-                        total_nutrition[key] += ingredient_nutrition[key]
+        if not isinstance(text, str) or not text.strip():
+            return jsonify({'error': 'No recipe text provided'}), 400
         
-        return jsonify({
-            'total': total_nutrition,
-            'ingredients': ingredient_details
-        })
+        parsed = RecipeParser().parse(text.strip())
+        if not parsed['ingredients']:
+            return jsonify({'error': 'No known ingredients found in recipe',
+                            'unmatched': parsed['unmatched']}), 400
+        
+        # Ingredients without a weight or volume are listed but not totalled
+        measured = [item for item in parsed['ingredients'] if item['quantity'] is not None]
+        summary = build_nutrition_summary(measured)
+        summary['parsed'] = parsed['ingredients']
+        summary['needs_quantity'] = [item for item in parsed['ingredients'] if item['quantity'] is None]
+        summary['unmatched'] = parsed['unmatched']
+        return jsonify(summary)
         
     except Exception as e:
-        logger.error(f"Error calculating nutrition: {e}")
-        return jsonify({'error': 'Error calculating nutrition'}), 500
+        logger.error(f"Error parsing recipe: {e}")
+        return jsonify({'error': 'Error parsing recipe'}), 500
 
 @app.route('/save-meal', methods=['POST'])
 def save_meal():
@@ -182,12 +240,23 @@ def upload_data():
             file_path = f'/tmp/{filename}'
             file.save(file_path)
             
-            # Process the file
+            # Skip files identical byte-for-byte to the latest import
             processor = NutritionDataProcessor()
-            count = processor.process_file(file_path)
-            
+            content_hash = processor.hash_file(file_path)
+            previous = processor.find_latest_import(content_hash)
+            if previous:
+                flash(f'{filename} is identical to the latest dataset, imported on '
+                      f'{previous.created_at:%Y-%m-%d %H:%M}; nothing to update', 'info')
+                return redirect(url_for('index'))
+
+            # Process the file, writing only new or changed rows
+            count, imported = processor.process_file(file_path, content_hash)
+
             if count > 0:
                 flash(f'Successfully processed {count} ingredients from {filename}', 'success')
+            elif imported:
+                # Recorded as imported, but every row matched the stored data
+                flash(f'{filename} was imported with no changes to existing ingredients', 'info')
             else:
                 flash('No data was processed from the file', 'error')
             
@@ -228,21 +297,7 @@ def add_manual_ingredient():
         # Get form data
         name = request.form.get('name', '').strip()
         category = request.form.get('category', '').strip()
-        calories = float(request.form.get('calories', 0))
-        protein = float(request.form.get('protein', 0))
-        carbs = float(request.form.get('carbs', 0))
-        fat = float(request.form.get('fat', 0))
-        fiber = float(request.form.get('fiber', 0))
-        sugar = float(request.form.get('sugar', 0))
-        sodium = float(request.form.get('sodium', 0))
-        potassium = float(request.form.get('potassium', 0))
-        calcium = float(request.form.get('calcium', 0))
-        iron = float(request.form.get('iron', 0))
-        vitamin_a = float(request.form.get('vitamin_a', 0))
-        vitamin_c = float(request.form.get('vitamin_c', 0))
-        vitamin_d = float(request.form.get('vitamin_d', 0))
-        vitamin_e = float(request.form.get('vitamin_e', 0))
-        vitamin_k = float(request.form.get('vitamin_k', 0))
+        nutrients = NutrientVector.from_mapping(request.form)
         
         if not name:
             flash('Ingredient name is required', 'error')
@@ -257,23 +312,9 @@ def add_manual_ingredient():
         # Create new ingredient
         ingredient = Ingredient(
             name=name,
-            category=category or 'User Added',
-            calories=calories,
-            protein=protein,
-            carbs=carbs,
-            fat=fat,
-            fiber=fiber,
-            sugar=sugar,
-            sodium=sodium,
-            potassium=potassium,
-            calcium=calcium,
-            iron=iron,
-            vitamin_a=vitamin_a,
-            vitamin_c=vitamin_c,
-            vitamin_d=vitamin_d,
-            vitamin_e=vitamin_e,
-            vitamin_k=vitamin_k
+            category=category or 'User Added'
         )
+        nutrients.apply_to(ingredient)
         
         db.session.add(ingredient)
         db.session.commit()
@@ -4,6 +4,7 @@ class MealPlanner {
     constructor() {
         this.selectedIngredients = [];
         this.nutritionChart = null;
+        this.catalogue = null;
         this.initializeEventListeners();
         this.loadIngredients();
     }
@@ -80,6 +81,13 @@ class MealPlanner {
     }
 
     async loadIngredients() {
+        // Search and calculate locally once the catalogue bundle is loaded
+        await this.loadCatalogue();
+        if (this.catalogue) {
+            this.searchIngredients();
+            return;
+        }
+
         try {
             const response = await fetch('/search-ingredients');
             if (response.ok) {
@@ -92,9 +100,122 @@ class MealPlanner {
         }
     }
 
+    async loadCatalogue() {
+        const storageKey = 'nutritionCatalogue';
+        try {
+            const metaResponse = await fetch('/catalogue-bundle');
+            if (!metaResponse.ok) return;
+            const meta = await metaResponse.json();
+
+            let cached = null;
+            try {
+                cached = JSON.parse(localStorage.getItem(storageKey));
+            } catch (error) {
+                cached = null;
+            }
+
+            let bundle = null;
+            if (cached && cached.version === meta.version) {
+                bundle = cached;
+            } else if (cached) {
+                // Fetch only the rows that changed since the cached version
+                const deltaResponse = await fetch(`${meta.url}/delta/${cached.version}`);
+                if (deltaResponse.ok) {
+                    bundle = this.applyCatalogueDelta(cached, await deltaResponse.json());
+                }
+            }
+
+            if (!bundle) {
+                const bundleResponse = await fetch(meta.url);
+                if (!bundleResponse.ok) return;
+                bundle = await bundleResponse.json();
+            }
+
+            try {
+                localStorage.setItem(storageKey, JSON.stringify(bundle));
+            } catch (error) {
+                // Storage full or disabled; the bundle is still usable for this page
+            }
+
+            this.catalogue = this.catalogueRows(bundle);
+        } catch (error) {
+            console.error('Error loading catalogue bundle:', error);
+            this.catalogue = null;
+        }
+    }
+
+    catalogueRows(bundle) {
+        return bundle.ids.map((id, i) => {
+            const row = { id: id, name: bundle.names[i], category: bundle.categories[i] };
+            bundle.fields.forEach((field, n) => {
+                row[field] = bundle.values[n][i];
+            });
+            return row;
+        });
+    }
+
+    applyCatalogueDelta(bundle, delta) {
+        const rows = new Map(this.catalogueRows(bundle).map(row => [row.id, row]));
+        delta.removed.forEach(id => rows.delete(id));
+        this.catalogueRows(delta).forEach(row => rows.set(row.id, row));
+
+        const ids = [...rows.keys()].sort((a, b) => a - b);
+        return {
+            version: delta.version,
+            fields: delta.fields,
+            ids: ids,
+            names: ids.map(id => rows.get(id).name),
+            categories: ids.map(id => rows.get(id).category),
+            values: delta.fields.map(field => ids.map(id => rows.get(id)[field]))
+        };
+    }
+
+    searchCatalogue(query, category) {
+        if (!query && !category) {
+            return this.catalogue.slice(0, 20);
+        }
+
+        const needle = query.toLowerCase();
+        return this.catalogue
+            .filter(ingredient => (!needle || ingredient.name.toLowerCase().includes(needle)) &&
+                                  (!category || ingredient.category === category))
+            .sort((a, b) => a.name.localeCompare(b.name))
+            .slice(0, 50);
+    }
+
+    calculateFromCatalogue(selectedIngredients) {
+        const byId = new Map(this.catalogue.map(ingredient => [ingredient.id, ingredient]));
+        const fields = Object.keys(this.catalogue[0] || {})
+            .filter(key => !['id', 'name', 'category'].includes(key));
+        const total = Object.fromEntries(fields.map(field => [field, 0]));
+        const ingredients = [];
+
+        selectedIngredients.forEach(item => {
+            const ingredient = byId.get(item.id);
+            const quantity = parseFloat(item.quantity) || 0;
+            if (!ingredient || quantity <= 0) return;
+
+            // Nutrient values are per 100g
+            const multiplier = quantity / 100.0;
+            const detail = { name: ingredient.name, quantity: quantity };
+            fields.forEach(field => {
+                detail[field] = ingredient[field] * multiplier;
+                total[field] += detail[field];
+            });
+            ingredients.push(detail);
+        });
+
+        return { total: total, ingredients: ingredients };
+    }
+
     async searchIngredients() {
         const query = document.getElementById('ingredientSearch')?.value || '';
         const category = document.getElementById('categoryFilter')?.value || '';
+
+        if (this.catalogue) {
+            this.displayIngredients(this.searchCatalogue(query, category));
+            return;
+        }
         
         const params = new URLSearchParams();
         if (query) params.append('q', query);
@@ -328,6 +449,13 @@ class MealPlanner {
         calculateBtn.innerHTML = '<span class="loading-spinner"></span> Calculating...';
         calculateBtn.disabled = true;
 
+        if (this.catalogue) {
+            this.displayNutritionResults(this.calculateFromCatalogue(this.selectedIngredients));
+            calculateBtn.innerHTML = originalContent;
+            calculateBtn.disabled = false;
+            return;
+        }
+
         try {
             const response = await fetch('/calculate-nutrition', {
                 method: 'POST',
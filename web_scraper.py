@@ -5,6 +5,7 @@ from typing import Dict, List, Optional
 import re
 from app import app, db
 from models import Ingredient
+from nutrients import NUTRIENT_FIELDS, NutrientVector
 
 logger = logging.getLogger(__name__)
 
@@ -78,21 +79,7 @@ class NutritionScraper:
         """
         Extract nutrition values from scraped text using regex patterns
         """
-        nutrition_data = {
-            'name': ingredient_name,
-            'calories': 0.0,
-            'protein': 0.0,
-            'carbs': 0.0,
-            'fat': 0.0,
-            'fiber': 0.0,
-            'sugar': 0.0,
-            'sodium': 0.0,
-            'potassium': 0.0,
-            'calcium': 0.0,
-            'iron': 0.0,
-            'vitamin_a': 0.0,
-            'vitamin_c': 0.0
-        }
+        nutrients = NutrientVector()
         
         # Regex patterns for extracting nutrition values
         patterns = {
@@ -107,21 +94,25 @@ class NutritionScraper:
             'calcium': r'calcium[\s:]*(\d+(?:\.\d+)?)',
             'iron': r'iron[\s:]*(\d+(?:\.\d+)?)',
             'vitamin_a': r'vitamin\s+a[\s:]*(\d+(?:\.\d+)?)',
-            'vitamin_c': r'vitamin\s+c[\s:]*(\d+(?:\.\d+)?)'
+            'vitamin_c': r'vitamin\s+c[\s:]*(\d+(?:\.\d+)?)',
+            'vitamin_d': r'vitamin\s+d\d?\b[\s:]*(\d+(?:\.\d+)?)',
+            'vitamin_e': r'vitamin\s+e[\s:]*(\d+(?:\.\d+)?)',
+            'vitamin_k': r'vitamin\s+k\d?\b[\s:]*(\d+(?:\.\d+)?)'
         }
         
         text_lower = text.lower()
         
-        for nutrient, pattern in patterns.items():
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
+        values = nutrients.to_array()
+        for i, nutrient in enumerate(NUTRIENT_FIELDS):
+            matches = re.findall(patterns[nutrient], text_lower, re.IGNORECASE)
             if matches:
                 try:
                     # Take the first match and convert to float
-                    nutrition_data[nutrient] = float(matches[0])
+                    values[i] = float(matches[0])
                 except (ValueError, IndexError):
                     continue
         
-        return nutrition_data
+        return {'name': ingredient_name, **nutrients.to_dict()}
     
     def scrape_and_save_ingredient(self, ingredient_name: str) -> bool:
         """
@@ -140,21 +131,8 @@ class NutritionScraper:
                     existing = Ingredient.query.filter_by(name=ingredient_name).first()
                     
                     if not existing:
-                        ingredient = Ingredient(
-                            name=nutrition_data['name'],
-                            calories=nutrition_data['calories'],
-                            protein=nutrition_data['protein'],
-                            carbs=nutrition_data['carbs'],
-                            fat=nutrition_data['fat'],
-                            fiber=nutrition_data['fiber'],
-                            sugar=nutrition_data['sugar'],
-                            sodium=nutrition_data['sodium'],
-                            potassium=nutrition_data['potassium'],
-                            calcium=nutrition_data['calcium'],
-                            iron=nutrition_data['iron'],
-                            vitamin_a=nutrition_data['vitamin_a'],
-                            vitamin_c=nutrition_data['vitamin_c']
-                        )
+                        ingredient = Ingredient(name=nutrition_data['name'])
+                        NutrientVector.from_mapping(nutrition_data).apply_to(ingredient)
                         
                         db.session.add(ingredient)
                         db.session.commit()